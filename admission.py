@@ -0,0 +1,173 @@
+"""
+Admission control for the /webhook route.
+Tracks in-flight requests and recent processing latency per worker and
+adapts a concurrency limit (AIMD, in the spirit of adaptive concurrency
+limits / CoDel). Past the limit, work is shed cheapest-first.
+"""
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from xml.sax.saxutils import escape
+
+from config import (
+    ADMISSION_MAX_LIMIT,
+    ADMISSION_TARGET_LATENCY_MS,
+    DUPLICATE_MENU_WINDOW_SECONDS,
+)
+from handlers import BUSY_MESSAGE
+
+logger = logging.getLogger(__name__)
+
+# ----- Admission decisions -----
+ADMIT          = "admit"
+SHED_DUPLICATE = "duplicate_menu"
+SHED_BUSY      = "busy"
+
+# Pre-rendered TwiML reply — Twilio delivers it from the webhook response,
+# so shedding costs no outbound API call
+BUSY_TWIML = (
+    '<?xml version="1.0" encoding="UTF-8"?>'
+    f"<Response><Message>{escape(BUSY_MESSAGE)}</Message></Response>"
+).encode("utf-8")
+
+_MIN_LIMIT     = 1.0
+_DECREASE      = 0.9    # multiplicative decrease when latency exceeds target
+_EWMA_ALPHA    = 0.2    # weight of the newest latency sample
+_MAX_TRACKED   = 10000  # hard cap on phones remembered for duplicate-menu detection
+
+
+def _now() -> float:
+    """Monotonic clock for latency and window measurements."""
+    return time.monotonic()
+
+
+class AdmissionController:
+    """
+    Per-process concurrency limiter.
+      * limit grows by 1/limit per fast request, shrinks ×0.9 per slow one
+        (at most once per target-latency interval)
+      * under pressure (at the limit, or busy with latency above target in
+        the last target window) a menu request is dropped silently if the
+        menu was just sent to that phone and nothing else has come in since
+      * at the limit everything else gets the cached busy reply
+    """
+
+    def __init__(self, max_limit: int, target_latency: float, duplicate_window: float):
+        self._lock = threading.Lock()
+        self.max_limit = float(max_limit)
+        self.target_latency = target_latency
+        self.duplicate_window = duplicate_window
+
+        self.limit = float(max_limit)
+        self.in_flight = 0
+        self.latency_ewma = 0.0
+        self._last_sample = 0.0     # when latency_ewma was last updated
+        self._last_decrease = 0.0
+        # phone → time the menu was last sent, oldest first
+        self._last_menu: "OrderedDict[str, float]" = OrderedDict()
+
+        self.admitted = 0
+        self.shed = {SHED_DUPLICATE: 0, SHED_BUSY: 0}
+
+    def _under_pressure(self, now: float) -> bool:
+        if self.in_flight >= int(self.limit):
+            return True
+        # Like CoDel's interval: a slow sample only counts while it is recent
+        # and work is still in flight, so an idle worker never stays "pressured"
+        recent = now - self._last_sample <= self.target_latency
+        return self.in_flight > 0 and recent and self.latency_ewma > self.target_latency
+
+    def _is_duplicate_menu(self, phone: str, now: float) -> bool:
+        last = self._last_menu.get(phone)
+        return last is not None and now - last < self.duplicate_window
+
+    def _remember_menu(self, phone: str, now: float) -> None:
+        self._last_menu.pop(phone, None)
+        self._last_menu[phone] = now
+        # Entries are in send order, so expired ones sit at the front
+        cutoff = now - self.duplicate_window
+        while self._last_menu:
+            sent_at = next(iter(self._last_menu.values()))
+            if sent_at >= cutoff and len(self._last_menu) <= _MAX_TRACKED:
+                break
+            self._last_menu.popitem(last=False)
+
+    def acquire(self, phone: str, is_menu: bool) -> str:
+        """Decide whether to process a message; ADMIT must be paired with release()."""
+        now = _now()
+        with self._lock:
+            if not is_menu:
+                # Any other message breaks the run: the next menu is a fresh request
+                self._last_menu.pop(phone, None)
+
+            if is_menu and self._is_duplicate_menu(phone, now) and self._under_pressure(now):
+                decision = SHED_DUPLICATE
+            elif self.in_flight >= int(self.limit):
+                decision = SHED_BUSY
+            else:
+                self.in_flight += 1
+                self.admitted += 1
+                return ADMIT
+            self.shed[decision] += 1
+            snapshot = (self.in_flight, self.limit, self.latency_ewma * 1000)
+
+        # DEBUG only: shedding must stay cheap, and shed_total already counts these
+        logger.debug(
+            "🚦 Shed %s for %s — in_flight=%d limit=%.1f latency=%.0fms",
+            decision, phone, *snapshot,
+        )
+        return decision
+
+    def release(self, latency: float, phone: str = "", menu_sent: bool = False) -> None:
+        """
+        Record the processing time of an admitted request and adapt the limit.
+        menu_sent marks that the main menu actually reached phone, so a
+        repeat of it can be treated as a duplicate.
+        """
+        now = _now()
+        with self._lock:
+            self.in_flight -= 1
+            if menu_sent and phone:
+                self._remember_menu(phone, now)
+            if self.latency_ewma == 0.0:
+                self.latency_ewma = latency
+            else:
+                self.latency_ewma += _EWMA_ALPHA * (latency - self.latency_ewma)
+            self._last_sample = now
+
+            if latency > self.target_latency:
+                if now - self._last_decrease >= self.target_latency:
+                    self.limit = max(_MIN_LIMIT, self.limit * _DECREASE)
+                    self._last_decrease = now
+                    logger.info("🚦 Limit ↓ %.1f (latency=%.0fms)", self.limit, latency * 1000)
+            else:
+                self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+
+    def metrics(self) -> str:
+        """Controller state in Prometheus text exposition format."""
+        with self._lock:
+            pid = os.getpid()
+            lines = [
+                "# TYPE ullas_admission_in_flight gauge",
+                f'ullas_admission_in_flight{{pid="{pid}"}} {self.in_flight}',
+                "# TYPE ullas_admission_limit gauge",
+                f'ullas_admission_limit{{pid="{pid}"}} {self.limit:.3f}',
+                "# TYPE ullas_admission_latency_ewma_seconds gauge",
+                f'ullas_admission_latency_ewma_seconds{{pid="{pid}"}} {self.latency_ewma:.6f}',
+                "# TYPE ullas_admission_admitted_total counter",
+                f'ullas_admission_admitted_total{{pid="{pid}"}} {self.admitted}',
+                "# TYPE ullas_admission_shed_total counter",
+            ]
+            for reason, count in self.shed.items():
+                lines.append(f'ullas_admission_shed_total{{pid="{pid}",reason="{reason}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+
+# ----- Module-level controller (one per worker process) -----
+controller = AdmissionController(
+    max_limit=ADMISSION_MAX_LIMIT,
+    target_latency=ADMISSION_TARGET_LATENCY_MS / 1000.0,
+    duplicate_window=DUPLICATE_MENU_WINDOW_SECONDS,
+)
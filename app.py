@@ -5,10 +5,14 @@ Simplified flow: Hi → Menu → Answer (no Ullas ID required)
 """
 import logging
 import sys
-from flask import Flask, request, jsonify
+import time
+from flask import Flask, request, jsonify, send_file, abort
 
+from admission import ADMIT, BUSY_TWIML, SHED_BUSY, controller
+from certificates import certificate_media_url, get_certificate_file, verify_certificate_token
 from config import FLASK_PORT, FLASK_DEBUG
-from handlers import MAIN_MENU, MENU_HANDLERS
+from handlers import MAIN_MENU, MENU_HANDLERS, get_certificate_attached
+from mock_data import PHONE_TO_ULLAS
 from whatsapp import send_message
 
 # ---- Logging ----
@@ -28,6 +32,8 @@ logger.info("=" * 60)
 
 app = Flask(__name__)
 
+MENU_KEYWORDS = ("hi", "hello", "hey", "start", "menu", "back", "main menu", "0")
+
 
 # ===================================================================
 #  ROUTES
@@ -39,6 +45,12 @@ def health():
     return jsonify({"status": "ok", "service": "ullas-whatsapp-chatbot"})
 
 
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    """Admission controller state for this worker (Prometheus text format)."""
+    return controller.metrics(), 200, {"Content-Type": "text/plain; version=0.0.4"}
+
+
 @app.route("/webhook", methods=["POST"])
 def handle_message():
     """Receive incoming WhatsApp messages from Twilio (form-encoded POST)."""
@@ -53,39 +65,89 @@ def handle_message():
     # Normalise phone number (strip whatsapp:+ prefix)
     phone = sender.replace("whatsapp:+", "").replace("whatsapp:", "").lstrip("+")
 
+    # ---- Admission control: shed load before doing any work ----
+    decision = controller.acquire(phone, body.lower() in MENU_KEYWORDS)
+    if decision == SHED_BUSY:
+        return BUSY_TWIML, 200, {"Content-Type": "application/xml"}
+    if decision != ADMIT:
+        return "", 200
+
+    started = time.monotonic()
+    menu_sent = False
     try:
-        _process_message(phone, body)
+        menu_sent = _process_message(phone, body)
     except Exception:
         logger.exception("💥 Unhandled exception")
+    finally:
+        controller.release(time.monotonic() - started, phone, menu_sent)
 
     return "", 200
 
 
+@app.route("/cert/<ullas_id>.pdf", methods=["GET"])
+def download_certificate(ullas_id: str):
+    """
+    Serve a cached certificate PDF to holders of a signed URL (?t=<token>).
+    send_file hands the open file to the server's wsgi.file_wrapper
+    (sendfile under gunicorn) and handles ETag / If-None-Match and Range.
+    """
+    # Check the token before touching the cache so unsigned requests can't trigger renders
+    if not verify_certificate_token(ullas_id, request.args.get("t", "")):
+        logger.info("📜 /cert/%s.pdf — missing or invalid token", ullas_id)
+        abort(404)
+    cached = get_certificate_file(ullas_id)
+    if cached is None:
+        logger.info("📜 /cert/%s.pdf — not available", ullas_id)
+        abort(404)
+    path, digest = cached
+    return send_file(
+        path,
+        mimetype="application/pdf",
+        download_name=f"{ullas_id}.pdf",
+        conditional=True,
+        etag=digest,
+        max_age=86400,
+    )
+
+
 # ===================================================================
 #  MESSAGE PROCESSING
 # ===================================================================
 
-def _process_message(phone: str, text: str) -> None:
+def _process_message(phone: str, text: str) -> bool:
     """
     Simple flow — no Ullas ID required:
       Hi / Hello / start / menu  →  show main menu
       1–6                        →  show answer for that option
       7                          →  talk to support
       anything else              →  show main menu
+    Returns True only if a menu keyword was answered and the menu was sent.
     """
     text_lower = text.lower().strip()
     logger.info("🔄 Processing — phone=%s text=[%s]", phone, text)
 
     # ---- Greetings / Menu keywords → show menu ----
-    if text_lower in ("hi", "hello", "hey", "start", "menu", "back", "main menu", "0"):
+    if text_lower in MENU_KEYWORDS:
         logger.info("🏠 Showing main menu to %s", phone)
-        send_message(phone, MAIN_MENU)
-        return
+        return send_message(phone, MAIN_MENU)
 
     # ---- Menu options 1–6 ----
     if text in MENU_HANDLERS:
         label, handler = MENU_HANDLERS[text]
         logger.info("📋 Option %s (%s) selected by %s", text, label, phone)
+
+        # Certificate: attach the cached PDF when this phone has one
+        if text == "5":
+            ullas_id = PHONE_TO_ULLAS.get(phone)
+            try:
+                media_url = certificate_media_url(ullas_id) if ullas_id else None
+            except Exception:
+                logger.exception("💥 Certificate render failed for %s", ullas_id)
+                media_url = None
+            if ullas_id and media_url:
+                send_message(phone, get_certificate_attached(ullas_id), media_url=media_url)
+                return False
+
         try:
             response = handler()
             logger.debug("📋 Response preview: %s", response[:80])
@@ -93,7 +155,7 @@ def _process_message(phone: str, text: str) -> None:
             logger.exception("💥 Handler for option %s failed", text)
             response = "⚠️ Something went wrong. Please try again.\n\n_Reply *menu* to go back._"
         send_message(phone, response)
-        return
+        return False
 
     # ---- Anything else → show menu ----
     logger.info("🤔 Unrecognised input [%s] from %s — showing menu", text, phone)
@@ -103,6 +165,7 @@ def _process_message(phone: str, text: str) -> None:
         "Please reply with a number *1–7* to choose an option:\n\n"
         + MAIN_MENU
     )
+    return False
 
 
 # ===================================================================
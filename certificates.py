@@ -0,0 +1,216 @@
+"""
+Certificate PDF generation and on-disk cache for the Ullas chatbot.
+PDFs are rendered once per (ullas_id, content hash) and then served
+straight from disk, so a results-day rush never re-renders anything.
+"""
+import glob
+import hashlib
+import hmac
+import json
+import logging
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Optional, Tuple
+
+from config import CERT_CACHE_DIR, CERT_URL_SECRET, PUBLIC_BASE_URL
+from mock_data import CERTIFICATES, STUDENTS
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever the PDF layout changes so cached files are re-rendered
+_TEMPLATE_VERSION = "1"
+_DIGEST_LEN = 20
+
+
+def _certificate_record(ullas_id: str) -> Optional[dict]:
+    """Return the fields printed on the certificate, or None if not available."""
+    cert = CERTIFICATES.get(ullas_id)
+    student = STUDENTS.get(ullas_id)
+    if not cert or not cert.get("available") or not student:
+        return None
+    record = {
+        "ullas_id": ullas_id,
+        "name":     student["name"],
+        "type":     cert["type"],
+        "event":    cert["event"],
+    }
+    # Helvetica only covers Latin-1; a Devanagari name would render blank
+    if not all(_is_latin1(value) for value in record.values()):
+        logger.warning("_certificate_record(%s) → fields outside Latin-1, no PDF", ullas_id)
+        return None
+    return record
+
+
+def _is_latin1(text: str) -> bool:
+    """True if text can be drawn with the built-in Helvetica font."""
+    try:
+        text.encode("latin-1")
+    except UnicodeEncodeError:
+        return False
+    return True
+
+
+def _content_hash(record: dict) -> str:
+    """Stable hash of the certificate contents — doubles as the HTTP ETag."""
+    payload = json.dumps(record, sort_keys=True) + "|" + _TEMPLATE_VERSION
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:_DIGEST_LEN]
+
+
+def _certificate_token(ullas_id: str, digest: str) -> str:
+    """HMAC of ullas_id|digest — the unguessable part of a certificate URL."""
+    msg = f"{ullas_id}|{digest}".encode("utf-8")
+    return hmac.new(CERT_URL_SECRET.encode("utf-8"), msg, hashlib.sha256).hexdigest()[:32]
+
+
+def verify_certificate_token(ullas_id: str, token: str) -> bool:
+    """True if token was issued for the student's current certificate."""
+    record = _certificate_record(ullas_id)
+    if record is None or not CERT_URL_SECRET or not token:
+        return False
+    expected = _certificate_token(ullas_id, _content_hash(record))
+    return hmac.compare_digest(expected, token)
+
+
+def _pdf_escape(text: str) -> str:
+    """Escape a string for use inside a PDF literal (Latin-1 text only)."""
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def render_certificate_pdf(record: dict) -> bytes:
+    """
+    Render a single-page A4 landscape certificate as PDF bytes.
+    Hand-written PDF (Helvetica, no external deps); output is deterministic
+    so the same record always produces the same file.
+    """
+    lines = [
+        (36, 470, "Ullas Student Programme"),
+        (28, 400, record["type"]),
+        (14, 330, "This is to certify that"),
+        (24, 290, record["name"]),
+        (14, 250, "Ullas ID: " + record["ullas_id"]),
+        (14, 210, "has participated in " + record["event"] + "."),
+    ]
+    text_ops = []
+    for size, y, text in lines:
+        # Rough centring: Helvetica averages ~0.5em per glyph
+        x = max(40, int((842 - len(text) * size * 0.5) / 2))
+        text_ops.append(
+            f"BT /F1 {size} Tf {x} {y} Td ({_pdf_escape(text)}) Tj ET"
+        )
+    stream = "\n".join(text_ops).encode("latin-1")
+
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 842 595] "
+        b"/Resources << /Font << /F1 4 0 R >> >> /Contents 5 0 R >>",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+        b"<< /Length " + str(len(stream)).encode() + b" >>\nstream\n" + stream + b"\nendstream",
+    ]
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for num, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{num} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref_at = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for off in offsets:
+        out += f"{off:010d} 00000 n \n".encode()
+    out += (
+        f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\n"
+        f"startxref\n{xref_at}\n%%EOF\n"
+    ).encode()
+    return bytes(out)
+
+
+def get_certificate_file(ullas_id: str) -> Optional[Tuple[str, str]]:
+    """
+    Return (path, etag) for the student's cached certificate PDF,
+    rendering it into the cache on first use. None if no certificate.
+    """
+    record = _certificate_record(ullas_id)
+    if record is None:
+        logger.debug("get_certificate_file(%s) → no certificate available", ullas_id)
+        return None
+
+    digest = _content_hash(record)
+    path = os.path.join(CERT_CACHE_DIR, f"{ullas_id}-{digest}.pdf")
+    if os.path.exists(path):
+        return path, digest
+
+    os.makedirs(CERT_CACHE_DIR, exist_ok=True)
+    # Write to a temp file and rename so concurrent workers never see a partial PDF
+    fd, tmp_path = tempfile.mkstemp(dir=CERT_CACHE_DIR, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(render_certificate_pdf(record))
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    logger.info("📜 Rendered certificate %s → %s", ullas_id, path)
+    _evict_stale(ullas_id, path)
+    return path, digest
+
+
+def _evict_stale(ullas_id: str, current_path: str) -> None:
+    """Delete cached PDFs for ullas_id rendered from older content hashes."""
+    pattern = os.path.join(glob.escape(CERT_CACHE_DIR), f"{glob.escape(ullas_id)}-{'?' * _DIGEST_LEN}.pdf")
+    for old_path in glob.glob(pattern):
+        if old_path == current_path:
+            continue
+        try:
+            os.remove(old_path)
+            logger.info("📜 Evicted stale certificate %s", old_path)
+        except FileNotFoundError:
+            pass  # another worker got there first
+
+
+def certificate_media_url(ullas_id: str) -> Optional[str]:
+    """Public URL Twilio can fetch the certificate from, or None if unavailable."""
+    if not PUBLIC_BASE_URL or not CERT_URL_SECRET:
+        logger.debug("certificate_media_url(%s) → PUBLIC_BASE_URL or CERT_URL_SECRET not set", ullas_id)
+        return None
+    cached = get_certificate_file(ullas_id)
+    if cached is None:
+        return None
+    _, digest = cached
+    # Content hash in the query string busts Twilio's media cache on changes;
+    # the signed token stops anyone walking the sequential Ullas IDs
+    token = _certificate_token(ullas_id, digest)
+    return f"{PUBLIC_BASE_URL.rstrip('/')}/cert/{ullas_id}.pdf?v={digest}&t={token}"
+
+
+def _warm_one(ullas_id: str) -> bool:
+    """Process-pool worker: render one certificate if it is missing."""
+    return get_certificate_file(ullas_id) is not None
+
+
+def warm_cache(ullas_ids: Optional[Iterable[str]] = None, processes: Optional[int] = None) -> int:
+    """
+    Pre-render certificates for a batch of students across a process pool.
+    Defaults to every student with an available certificate; the pool is
+    capped at min(len(ids), cpu_count). Returns the number of certificates
+    now present in the cache.
+    """
+    ids = list(ullas_ids) if ullas_ids is not None else [
+        uid for uid, cert in CERTIFICATES.items() if cert.get("available")
+    ]
+    if not ids:
+        return 0
+    # Never fork more processes than there is work or CPUs; callers can go lower
+    cap = min(len(ids), os.cpu_count() or 1)
+    processes = min(processes, cap) if processes else cap
+    os.makedirs(CERT_CACHE_DIR, exist_ok=True)
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        warmed = sum(pool.map(_warm_one, ids, chunksize=max(1, len(ids) // 32)))
+    logger.info("📜 Certificate cache warm — %d/%d ready in %s", warmed, len(ids), CERT_CACHE_DIR)
+    return warmed
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    warm_cache()
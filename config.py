@@ -21,6 +21,20 @@ VERIFY_TOKEN = os.getenv("VERIFY_TOKEN", "ullas_verify_token_2026")
 # --- Session ---
 SESSION_TIMEOUT_SECONDS = int(os.getenv("SESSION_TIMEOUT_SECONDS", "600"))  # 10 minutes
 
+# --- Certificates ---
+# Rendered PDFs are cached here, keyed by Ullas ID + content hash
+CERT_CACHE_DIR  = os.getenv("CERT_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "cert_cache"))
+# Public base URL Twilio fetches media from; Render injects RENDER_EXTERNAL_URL
+PUBLIC_BASE_URL = os.getenv("PUBLIC_BASE_URL", os.getenv("RENDER_EXTERNAL_URL", ""))
+# Signs /cert URLs so IDs can't be enumerated; defaults to the Twilio auth token
+CERT_URL_SECRET = os.getenv("CERT_URL_SECRET", TWILIO_AUTH_TOKEN)
+
+# --- Admission control (per worker process) ---
+# Upper bound on concurrent /webhook requests; keep below gunicorn threads so /health stays free
+ADMISSION_MAX_LIMIT           = int(os.getenv("ADMISSION_MAX_LIMIT", "6"))
+ADMISSION_TARGET_LATENCY_MS   = int(os.getenv("ADMISSION_TARGET_LATENCY_MS", "2000"))
+DUPLICATE_MENU_WINDOW_SECONDS = int(os.getenv("DUPLICATE_MENU_WINDOW_SECONDS", "30"))
+
 # --- Flask ---
 # Render injects PORT automatically; fall back to FLASK_PORT or 10000
 FLASK_PORT  = int(os.getenv("PORT", os.getenv("FLASK_PORT", "10000")))
@@ -33,5 +47,10 @@ logger.info("   TWILIO_AUTH_TOKEN      : %s", "set" if TWILIO_AUTH_TOKEN else "
 logger.info("   TWILIO_WHATSAPP_NUMBER : %s", TWILIO_WHATSAPP_NUMBER)
 logger.info("   VERIFY_TOKEN           : %s", VERIFY_TOKEN[:4] + "***" if VERIFY_TOKEN else "❌ NOT SET")
 logger.info("   SESSION_TIMEOUT        : %ss", SESSION_TIMEOUT_SECONDS)
+logger.info("   CERT_CACHE_DIR         : %s", CERT_CACHE_DIR)
+logger.info("   PUBLIC_BASE_URL        : %s", PUBLIC_BASE_URL or "❌ NOT SET (certificates sent without media)")
+logger.info("   CERT_URL_SECRET        : %s", "set" if CERT_URL_SECRET else "❌ NOT SET (certificates sent without media)")
+logger.info("   ADMISSION_MAX_LIMIT    : %s", ADMISSION_MAX_LIMIT)
+logger.info("   ADMISSION_TARGET       : %sms", ADMISSION_TARGET_LATENCY_MS)
 logger.info("   FLASK_PORT             : %s", FLASK_PORT)
 logger.info("   FLASK_DEBUG            : %s", FLASK_DEBUG)
@@ -1,14 +1,22 @@
 """
 Gunicorn configuration for Render deployment.
 """
+import logging
 import os
 
+logger = logging.getLogger(__name__)
+
 # Bind to the PORT env variable that Render sets
 bind = f"0.0.0.0:{os.getenv('PORT', '10000')}"
 
-# 2 sync workers is optimal for Render free tier (1 vCPU)
+# 2 workers is optimal for Render free tier (1 vCPU)
 workers = 2
 
+# Threaded workers so one slow Twilio call doesn't block the process;
+# admission control keeps /webhook below this so /health always gets a thread
+worker_class = "gthread"
+threads = 8
+
 # Keep connections alive between requests — reduces TLS handshake overhead
 keepalive = 5
 
@@ -19,3 +27,14 @@ timeout = 60
 loglevel = "warning"
 accesslog = "-"
 errorlog  = "-"
+
+
+def on_starting(server):
+    """Pre-render certificate PDFs once in the master, before workers fork."""
+    # Best-effort only: get_certificate_file renders lazily on a cold cache
+    try:
+        from certificates import warm_cache
+        # Small explicit pool: os.cpu_count() reports the host, not our 1 vCPU
+        warm_cache(processes=1)
+    except Exception:
+        logger.exception("💥 Certificate cache warm-up failed — continuing boot")
@@ -1,6 +1,7 @@
 """
 Query handlers for the Ullas WhatsApp Chatbot.
 """
+from mock_data import CERTIFICATES
 
 _DIV = "─────────────────────────"
 _NAV = "↩️ Reply *menu* for Main Menu"
@@ -19,6 +20,12 @@ MAIN_MENU = (
     "_Reply with a number (1–8)_"
 )
 
+BUSY_MESSAGE = (
+    "⏳ *We're getting a lot of messages right now.*\n\n"
+    "Please try again in a minute.\n\n"
+    f"{_NAV}"
+)
+
 
 def get_registration_status() -> str:
     """1️⃣ Registration Status"""
@@ -104,6 +111,20 @@ def get_certificate_status() -> str:
     )
 
 
+def get_certificate_attached(ullas_id: str) -> str:
+    """5️⃣ Certificate Status — caption sent with the certificate PDF"""
+    cert = CERTIFICATES[ullas_id]
+    return (
+        "❓ *Can I get my Certificate?*\n"
+        f"{_DIV}\n\n"
+        "✅ *Status:* Available\n"
+        f"📜 *Type:* {cert['type']}\n"
+        f"🌟 *Event:* {cert['event']}\n\n"
+        "📎 Your certificate PDF is attached to this message.\n\n"
+        f"{_NAV}"
+    )
+
+
 def get_renewal_status() -> str:
     """6️⃣ Renewal Status"""
     return (
@@ -3,6 +3,7 @@ WhatsApp messaging utility — powered by Twilio.
 Sends text messages via the Twilio WhatsApp Sandbox API.
 """
 import logging
+from typing import Optional
 from twilio.rest import Client
 from config import (
     TWILIO_ACCOUNT_SID,
@@ -27,19 +28,22 @@ else:
 logger.info("📱 Twilio client ready — from=%s", _FROM)
 
 
-def send_message(to: str, body: str) -> bool:
+def send_message(to: str, body: str, media_url: Optional[str] = None) -> bool:
     """
-    Send a WhatsApp message via Twilio.
+    Send a WhatsApp message via Twilio, optionally with one media attachment.
     Uses the module-level client singleton for speed.
     """
     to_formatted = f"whatsapp:+{to.lstrip('+')}" 
     logger.info("📤 Sending to %s", to_formatted)
 
+    kwargs = {"media_url": [media_url]} if media_url else {}
+
     try:
         message = _client.messages.create(
             body=body,
             from_=_FROM,
             to=to_formatted,
+            **kwargs,
         )
         logger.info("✅ Sent! SID=%s", message.sid)
         return True